@@ -3,12 +3,23 @@ This module contains a single class ForceField used to output a GROMACS .ff forc
 """
 
 import os
+import locale
 import shutil
-import functools
+import itertools
 
 from .util import dir_up
 from .parsers.cfg import CFG
 
+# Write buffer size for the potentially large .rtp and .r2b files
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Row format and trailing constant columns of each .rtp bond section - dihedrals have multiplicity 1
+# The number of atom columns relies on BondSet.get_bond_lengths, get_bond_angles and get_bond_dihedrals
+# returning only bonds with 2, 3 and 4 atoms respectively
+_RTP_SECTION_FORMATS = {"bonds":     ("    %4s %4s %12.5f %12.5f", ()),
+                        "angles":    ("    %4s %4s %4s %12.5f %12.5f", ()),
+                        "dihedrals": ("    %4s %4s %4s %4s %12.5f %12.5f %4d", (1,))}
+
 
 class ForceField:
     """
@@ -20,30 +31,33 @@ class ForceField:
 
         :param name: Forcefield name to open/create
         """
-        self.dirname = "ff{0}.ff".format(name)
-        os.makedirs(self.dirname, exist_ok=True)
+        self.dirname = dirname = "ff{0}.ff".format(name)
+        os.makedirs(dirname, exist_ok=True)
 
-        with open(os.path.join(self.dirname, "forcefield.itp"), "w") as itp:
+        with open(os.path.join(dirname, "forcefield.itp"), "w") as itp:
             print("#define _FF_PYCGTOOL_{0}".format(name), file=itp)
             print('#include "martini_v2.2.itp"', file=itp)
 
         dist_dat_dir = os.path.join(dir_up(os.path.realpath(__file__), 2), "data")
-        # Copy main MARTINI itp
-        shutil.copyfile(os.path.join(dist_dat_dir, "martini_v2.2.itp"),
-                        os.path.join(self.dirname, "martini_v2.2.itp"))
+        martini_itp = os.path.join(dist_dat_dir, "martini_v2.2.itp")
+        # Copy main MARTINI itp - read once and reuse contents for atomtypes.atp below
+        with open(martini_itp, "rb") as src:
+            martini_data = src.read()
+        with open(os.path.join(dirname, "martini_v2.2.itp"), "wb") as dst:
+            dst.write(martini_data)
         # Copy water models
-        shutil.copyfile(os.path.join(dist_dat_dir, "watermodels.dat"),
-                        os.path.join(self.dirname, "watermodels.dat"))
-        shutil.copyfile(os.path.join(dist_dat_dir, "w.itp"),
-                        os.path.join(self.dirname, "w.itp"))
+        for data_file in ("watermodels.dat", "w.itp"):
+            shutil.copyfile(os.path.join(dist_dat_dir, data_file),
+                            os.path.join(dirname, data_file))
 
         # Create atomtypes.atp required for correct masses with pdb2gmx
-        with CFG(os.path.join(dist_dat_dir, "martini_v2.2.itp"), allow_duplicate=True) as cfg,\
-                open(os.path.join(self.dirname, "atomtypes.atp"), 'w') as atomtypes:
-            for toks in cfg["atomtypes"]:
-                print(" ".join(toks), file=atomtypes)
+        # Decode as open() would in text mode so parsing matches reading the file directly
+        martini_text = martini_data.decode(locale.getpreferredencoding(False))
+        with CFG.from_string(martini_text, martini_itp, allow_duplicate=True) as cfg,\
+                open(os.path.join(dirname, "atomtypes.atp"), 'w') as atomtypes:
+            atomtypes.write("".join(" ".join(toks) + "\n" for toks in cfg["atomtypes"]))
 
-        with open(os.path.join(self.dirname, "forcefield.doc"), "w") as doc:
+        with open(os.path.join(dirname, "forcefield.doc"), "w") as doc:
             print("PyCGTOOL produced MARTINI force field - {0}".format(name), file=doc)
 
     def write(self, filename, mapping, bonds):
@@ -60,56 +74,65 @@ class ForceField:
         :param mapping: AA->CG mapping from which to collect molecules
         :param bonds: BondSet from which to collect bonds
         """
-        def write_bond_angle_dih(bonds, section_header, file, multiplicity=None):
-            if bonds:
-                print("  [ {0:s} ]".format(section_header), file=file)
-            for bond in bonds:
-                line = "    " + " ".join(["{0:>4s}".format(atom) for atom in bond.atoms])
-                line += " {0:12.5f} {1:12.5f}".format(bond.eqm, bond.fconst)
-                if multiplicity is not None:
-                    line += " {0:4d}".format(multiplicity)
-                print(line, file=file)
-
-        def any_starts_with(iterable, char):
+        def write_bond_angle_dih(bonds, section_header, file):
+            if not bonds:
+                return
+            row_fmt, extra = _RTP_SECTION_FORMATS[section_header]
+            values = tuple(itertools.chain.from_iterable(
+                tuple(bond.atoms) + (bond.eqm, bond.fconst) + extra for bond in bonds
+            ))
+            file.write("  [ %s ]\n" % section_header)
+            file.write("\n".join([row_fmt] * len(bonds)) % values)
+            file.write("\n")
+
+        def partition_bonds(iterable, strip=None):
             """
-            Return True if any atoms of any bonds in molecule start with 'char'.
-
-            i.e. if char='-' or '+' is part of polymer.
+            Remove bonds to neighbouring residues and check which neighbours the remaining bonds reference.
 
             :param iterable: Iterable of bond entries to check
-            :param char: Char to check each atom name for startswith, in '-+'
-            :return: True if any atom name in molecule bonds starts with char, else False
+            :param strip: Chars in '-+' - bonds with an atom name starting with one of these are removed
+            :return: List of kept bonds, whether any kept bond references '-' and whether any references '+'
             """
-            recurse = functools.partial(any_starts_with, char=char)
-            if type(iterable) is str:
-                return iterable.startswith(char)
+            if strip is None:
+                kept = list(iterable)
             else:
-                return any(map(recurse, iterable))
-
-        def write_residue(name, rtp, strip=None, prepend=""):
+                strip = tuple(strip)
+                kept = [bond for bond in iterable if not any(atom[:1] in strip for atom in bond.atoms)]
+
+            # Bit 1 - references previous residue, bit 2 - references next residue
+            mask = 0
+            for bond in kept:
+                for atom in bond.atoms:
+                    prefix = atom[:1]
+                    if prefix == "-":
+                        mask |= 1
+                    elif prefix == "+":
+                        mask |= 2
+                if mask == 3:
+                    break
+            return kept, bool(mask & 1), bool(mask & 2)
+
+        def write_residue(name, rtp, sections, strip=None, prepend=""):
             print("[ {0} ]".format(prepend + name), file=rtp)
 
-            print("  [ atoms ]", file=rtp)
-            for bead in mapping[name]:
-                #          name  type  charge  chg-group
-                print("    {:>4s} {:>4s} {:3.6f} {:4d}".format(
-                    bead.name, bead.type, bead.charge, 0
-                ), file=rtp)
+            beads = mapping[name]
+            #            name type charge chg-group
+            row_fmt = "    %4s %4s %3.6f %4d"
+            values = tuple(itertools.chain.from_iterable(
+                (bead.name, bead.type, bead.charge, 0) for bead in beads
+            ))
+            rtp.write("  [ atoms ]\n")
+            if beads:
+                rtp.write("\n".join([row_fmt] * len(beads)) % values)
+                rtp.write("\n")
 
             needs_terminal_entry = [False, False]
 
-            get_bond_functions = [("bonds", functools.partial(bonds.get_bond_lengths, with_constr=True)),
-                                  ("angles", bonds.get_bond_angles),
-                                  ("dihedrals", bonds.get_bond_dihedrals)]
-
-            for get_bond in get_bond_functions:
-                bond_tmp = get_bond[1](name)
-                if strip is not None:
-                    bond_tmp = [bond for bond in bond_tmp if not any_starts_with(bond, strip)]
-                write_bond_angle_dih(bond_tmp, get_bond[0], rtp,
-                                     multiplicity=1 if get_bond[0] == "dihedrals" else None)
-                needs_terminal_entry[0] |= any_starts_with(bond_tmp, "-")
-                needs_terminal_entry[1] |= any_starts_with(bond_tmp, "+")
+            for section_header, section_bonds in sections:
+                bond_tmp, refs_prev, refs_next = partition_bonds(section_bonds, strip)
+                write_bond_angle_dih(bond_tmp, section_header, rtp)
+                needs_terminal_entry[0] |= refs_prev
+                needs_terminal_entry[1] |= refs_next
 
             return needs_terminal_entry
 
@@ -117,7 +140,7 @@ class ForceField:
         c_terms = set()
         both_terms = set()
 
-        with open(os.path.join(self.dirname, filename + ".rtp"), "w") as rtp:
+        with open(os.path.join(self.dirname, filename + ".rtp"), "w", buffering=_WRITE_BUFFER_SIZE) as rtp:
             print("[ bondedtypes ]", file=rtp)
             print(("{:4d}" * 8).format(1, 1, 1, 1, 1, 1, 0, 0), file=rtp)
 
@@ -126,26 +149,35 @@ class ForceField:
                 if mol not in bonds:
                     continue
 
-                needs_terminal_entry = write_residue(mol, rtp)
+                # Collect bonds once and reuse them for each terminal variant
+                sections = [("bonds", bonds.get_bond_lengths(mol, with_constr=True)),
+                            ("angles", bonds.get_bond_angles(mol)),
+                            ("dihedrals", bonds.get_bond_dihedrals(mol))]
+
+                needs_terminal_entry = write_residue(mol, rtp, sections)
                 if needs_terminal_entry[0]:
-                    write_residue(mol, rtp, strip="-", prepend="N")
+                    write_residue(mol, rtp, sections, strip="-", prepend="N")
                     n_terms.add(mol)
                 if needs_terminal_entry[1]:
-                    write_residue(mol, rtp, strip="+", prepend="C")
+                    write_residue(mol, rtp, sections, strip="+", prepend="C")
                     c_terms.add(mol)
                 if all(needs_terminal_entry):
-                    write_residue(mol, rtp, strip=("-", "+"), prepend="2")
+                    write_residue(mol, rtp, sections, strip=("-", "+"), prepend="2")
                     both_terms.add(mol)
 
         return n_terms, c_terms, both_terms
 
     def _write_r2b(self, filename, n_terms, c_terms, both_terms):
-        with open(os.path.join(self.dirname, filename + ".r2b"), "w") as r2b:
-            print("; rtp residue to rtp building block table", file=r2b)
-            print(";     main  N-ter C-ter 2-ter", file=r2b)
-
-            for resname in set.union(n_terms, c_terms, both_terms):
-                nter_str = ("N" + resname) if resname in n_terms else "-"
-                cter_str = ("C" + resname) if resname in c_terms else "-"
-                both_ter_str = ("2" + resname) if resname in both_terms else "-"
-                print("{0:5s} {0:5s} {1:5s} {2:5s} {3:5s}".format(resname, nter_str, cter_str, both_ter_str), file=r2b)
+        lines = ["; rtp residue to rtp building block table",
+                 ";     main  N-ter C-ter 2-ter"]
+
+        # both_terms is a subset of n_terms and c_terms - sort for deterministic output
+        for resname in sorted(n_terms | c_terms):
+            nter_str = ("N" + resname) if resname in n_terms else "-"
+            cter_str = ("C" + resname) if resname in c_terms else "-"
+            both_ter_str = ("2" + resname) if resname in both_terms else "-"
+            lines.append("%-5s %-5s %-5s %-5s %-5s" % (resname, resname, nter_str, cter_str, both_ter_str))
+
+        with open(os.path.join(self.dirname, filename + ".r2b"), "w", buffering=_WRITE_BUFFER_SIZE) as r2b:
+            r2b.write("\n".join(lines))
+            r2b.write("\n")
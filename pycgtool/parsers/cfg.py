@@ -3,6 +3,7 @@ Module containing classes used to parse custom CFG file format.
 
 Format is based upon GROMACS .itp files but does not support nesting of sections.
 """
+import io
 import os
 
 from collections import OrderedDict
@@ -60,31 +61,66 @@ class CFG:
         :param allow_duplicate: Allow sections to appear more than once in a file
         :return: Instance of CFG
         """
+        self._init_state(filename)
+
+        with open(self.filename) as f:
+            self._parse_lines(f, allow_duplicate)
+
+    @classmethod
+    def from_string(cls, string, filename=None, allow_duplicate=False):
+        """
+        Parse config file contents which have already been read and extract Sections.
+
+        :param string: Contents of config file
+        :param filename: Name of file the contents were read from, required to locate #include files
+        :param allow_duplicate: Allow sections to appear more than once in a file
+        :return: Instance of CFG
+        """
+        cfg = cls.__new__(cls)
+        cfg._init_state(filename)
+        # Universal newlines to split lines exactly as when iterating over a file
+        cfg._parse_lines(io.StringIO(string, newline=None), allow_duplicate)
+        return cfg
+
+    def _init_state(self, filename):
+        """
+        Set up attributes shared by all constructors.
+
+        :param filename: Name of file the config is read from
+        """
         self.filename = filename
         self._sections = OrderedDict()
 
-        with open(self.filename) as f:
-            curr_section = None
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith(";"):
-                    continue
-
-                elif line.startswith("#include"):
-                    cfg2 = CFG(os.path.join(os.path.dirname(self.filename),
-                                            line.split()[1]))
-                    self._sections.update(cfg2._sections)
-                    continue
-
-                elif line.startswith("["):
-                    curr_section = line.strip("[ ]")
-                    if curr_section in self._sections and not allow_duplicate:
-                        raise DuplicateSectionError(curr_section, self.filename)
-                    self._sections[curr_section] = Section(name=curr_section)
-                    continue
-
-                toks = tuple(line.split())
-                self._sections[curr_section].add_line(toks)
+    def _parse_lines(self, lines, allow_duplicate):
+        """
+        Extract Sections from the lines of a config file.
+
+        :param lines: Iterable of lines to parse
+        :param allow_duplicate: Allow sections to appear more than once in a file
+        """
+        curr_section = None
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith(";"):
+                continue
+
+            elif line.startswith("#include"):
+                if self.filename is None:
+                    raise ValueError("Cannot resolve '{0}' without the name of the including file.".format(line))
+                cfg2 = CFG(os.path.join(os.path.dirname(self.filename),
+                                        line.split()[1]))
+                self._sections.update(cfg2._sections)
+                continue
+
+            elif line.startswith("["):
+                curr_section = line.strip("[ ]")
+                if curr_section in self._sections and not allow_duplicate:
+                    raise DuplicateSectionError(curr_section, self.filename)
+                self._sections[curr_section] = Section(name=curr_section)
+                continue
+
+            toks = tuple(line.split())
+            self._sections[curr_section].add_line(toks)
 
     def __enter__(self):
         return self
@@ -1,5 +1,6 @@
 import unittest
 
+import copy
 import logging
 
 from pycgtool.bondset import BondSet
@@ -45,6 +46,32 @@ class BondSetTest(unittest.TestCase):
         ( 75.370211843364,    279.80889,   50,    1250)
     ]
 
+    _sugar_cgframes = None
+
+    @classmethod
+    def support_sugar_cgframes(cls):
+        # Map the sugar trajectory on first use only and replay the CG frames in each test
+        if cls._sugar_cgframes is None:
+            frame = Frame("test/data/sugar.gro", xtc="test/data/sugar.xtc")
+            mapping = Mapping("test/data/sugar.map", DummyOptions)
+
+            cgframes = []
+            cgframe = mapping.apply(frame)
+            while frame.next_frame():
+                cgframe = mapping.apply(frame, cgframe=cgframe)
+                cgframes.append(copy.deepcopy(cgframe))
+            cls._sugar_cgframes = cgframes
+
+        return cls._sugar_cgframes
+
+    def support_measure_sugar(self, options):
+        measure = BondSet("test/data/sugar.bnd", options)
+        for cgframe in self.support_sugar_cgframes():
+            measure.apply(cgframe)
+
+        measure.boltzmann_invert()
+        return measure
+
     def test_bondset_create(self):
         measure = BondSet("test/data/sugar.bnd", DummyOptions)
         self.assertEqual(1, len(measure))
@@ -88,32 +115,14 @@ class BondSetTest(unittest.TestCase):
                                    delta=abs(ref[i][fc_column_number] * accuracy))
 
     def test_bondset_boltzmann_invert(self):
-        measure = BondSet("test/data/sugar.bnd", DummyOptions)
-        frame = Frame("test/data/sugar.gro", xtc="test/data/sugar.xtc")
-        mapping = Mapping("test/data/sugar.map", DummyOptions)
-
-        cgframe = mapping.apply(frame)
-        while frame.next_frame():
-            cgframe = mapping.apply(frame, cgframe=cgframe)
-            measure.apply(cgframe)
-
-        measure.boltzmann_invert()
+        measure = self.support_measure_sugar(DummyOptions)
         self.support_check_mean_fc(measure["ALLA"], 1)
 
     def test_bondset_boltzmann_invert_default_fc(self):
         class DefaultOptions(DummyOptions):
             default_fc = True
 
-        measure = BondSet("test/data/sugar.bnd", DefaultOptions)
-        frame = Frame("test/data/sugar.gro", xtc="test/data/sugar.xtc")
-        mapping = Mapping("test/data/sugar.map", DefaultOptions)
-
-        cgframe = mapping.apply(frame)
-        while frame.next_frame():
-            cgframe = mapping.apply(frame, cgframe=cgframe)
-            measure.apply(cgframe)
-
-        measure.boltzmann_invert()
+        measure = self.support_measure_sugar(DefaultOptions)
         self.support_check_mean_fc(measure["ALLA"], 2)
 
     def test_bondset_boltzmann_invert_func_forms(self):
@@ -122,16 +131,7 @@ class BondSetTest(unittest.TestCase):
             angle_form = "Harmonic"
             dihedral_form = "MartiniDefaultLength"
 
-        measure = BondSet("test/data/sugar.bnd", FuncFormOptions)
-        frame = Frame("test/data/sugar.gro", xtc="test/data/sugar.xtc")
-        mapping = Mapping("test/data/sugar.map", DummyOptions)
-
-        cgframe = mapping.apply(frame)
-        while frame.next_frame():
-            cgframe = mapping.apply(frame, cgframe=cgframe)
-            measure.apply(cgframe)
-
-        measure.boltzmann_invert()
+        measure = self.support_measure_sugar(FuncFormOptions)
         self.support_check_mean_fc(measure["ALLA"], 3)
 
     @unittest.skipIf(not mdtraj_present, "MDTRAJ or Scipy not present")
@@ -176,16 +176,8 @@ class BondSetTest(unittest.TestCase):
             self.assertEqual(float("inf"), bond.fconst)
 
     def test_full_itp_sugar(self):
-        measure = BondSet("test/data/sugar.bnd", DummyOptions)
-        frame = Frame("test/data/sugar.gro", xtc="test/data/sugar.xtc")
+        measure = self.support_measure_sugar(DummyOptions)
         mapping = Mapping("test/data/sugar.map", DummyOptions)
-        cgframe = mapping.apply(frame)
-
-        while frame.next_frame():
-            cgframe = mapping.apply(frame, cgframe=cgframe)
-            measure.apply(cgframe)
-
-        measure.boltzmann_invert()
 
         logging.disable(logging.WARNING)
         measure.write_itp("sugar_out.itp", mapping)
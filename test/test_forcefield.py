@@ -2,6 +2,17 @@ import unittest
 import os
 
 from pycgtool.forcefield import ForceField
+from pycgtool.bondset import BondSet
+from pycgtool.mapping import Mapping
+from pycgtool.util import cmp_whitespace_float
+
+
+class DummyOptions:
+    constr_threshold = 100000
+    map_center = "geom"
+    angle_default_fc = False
+    generate_angles = True
+    generate_dihedrals = False
 
 
 class ForceFieldTest(unittest.TestCase):
@@ -13,5 +24,27 @@ class ForceFieldTest(unittest.TestCase):
         self.assertTrue(os.path.isdir(dirname))
         ForceField(name)
 
+    def test_r2b_sorted(self):
+        ff = ForceField("test")
+        ff._write_r2b("test", {"B", "A"}, {"C", "A"}, {"A"})
+        with open(os.path.join("fftest.ff", "test.r2b")) as r2b:
+            resnames = [line.split()[0] for line in r2b if not line.startswith(";")]
+        self.assertEqual(["A", "B", "C"], resnames)
+
+    def test_write_rtp_polymer(self):
+        bonds = BondSet("test/data/polyterm.bnd", DummyOptions)
+        mapping = Mapping("test/data/polyethene.map", DummyOptions)
+        # Fixed parameters in place of a Boltzmann inversion
+        for i, bond in enumerate(bonds["ETH"]):
+            bond.eqm = 0.1 * (i + 1)
+            bond.fconst = 1000. + i
+
+        ff = ForceField("test")
+        ff.write("polyterm", mapping, bonds)
+        self.assertTrue(cmp_whitespace_float(os.path.join("fftest.ff", "polyterm.rtp"),
+                                             "test/data/polyterm.rtp"))
+        self.assertTrue(cmp_whitespace_float(os.path.join("fftest.ff", "polyterm.r2b"),
+                                             "test/data/polyterm.r2b"))
+
 if __name__ == '__main__':
     unittest.main()
@@ -37,6 +37,28 @@ class TestParsersCFG(unittest.TestCase):
             self.assertTrue("DOPC" in cfg)
             self.assertTrue("GLY" in cfg)
 
+    def test_from_string(self):
+        with open("test/data/water.map") as f:
+            cfg = CFG.from_string(f.read(), "test/data/water.map")
+        self.assertTrue("SOL" in cfg)
+        for line in cfg["SOL"]:
+            self.assertEqual(self.watline, line)
+
+    def test_from_string_duplicate_error(self):
+        with open("test/data/twice.cfg") as f:
+            with self.assertRaises(DuplicateSectionError):
+                CFG.from_string(f.read(), "test/data/twice.cfg")
+
+    def test_from_string_include_without_filename(self):
+        with open("test/data/martini.map") as f:
+            with self.assertRaises(ValueError):
+                CFG.from_string(f.read())
+
+    def test_from_string_line_separators(self):
+        # Only newlines separate lines when reading a file - other separators must not
+        cfg = CFG.from_string("[ SEC ]\nA B\x0c; C\r\nD E\n")
+        self.assertEqual([("A", "B", ";", "C"), ("D", "E")], list(cfg["SEC"]))
+
 
 if __name__ == '__main__':
     unittest.main()